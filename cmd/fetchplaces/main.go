@@ -693,6 +693,21 @@ func processVendorPlaces(ctx context.Context, db *sql.DB, vendor vendorRow, sour
 	}
 	logSkips := source == placeSourceFoursquare
 
+	// All of a vendor's upserts (and the contact backfill) share one transaction,
+	// so the batch pays a single commit instead of one per place. Each upsert runs
+	// under a savepoint so a bad row is logged and skipped without aborting the rest.
+	var tx *sql.Tx
+	if !dryRun {
+		var err error
+		if tx, err = db.BeginTx(ctx, nil); err != nil {
+			// Matches are still counted below so they show up as unsaved, and stay
+			// in SavedIDs so a following prune keeps their existing rows.
+			log.Printf("  begin error for %s places of %s: %v", source, vendor.Name, err)
+		} else {
+			defer tx.Rollback()
+		}
+	}
+
 	for _, place := range places {
 		place.Source = source
 		if !hasCoordinates(place) || placeID(place) == "" {
@@ -720,17 +735,64 @@ func processVendorPlaces(ctx context.Context, db *sql.DB, vendor vendorRow, sour
 			result.SavedIDs[placeID(place)] = true
 			continue
 		}
-		if err := upsertVendorPlace(ctx, db, vendor, place); err != nil {
+		if tx == nil {
+			result.SavedIDs[placeID(place)] = true
+			continue
+		}
+		if err := upsertVendorPlaceSavepoint(ctx, tx, vendor, place); err != nil {
 			log.Printf("  save error for %s place %s: %v", source, place.Name, err)
 			continue
 		}
 		result.Saved++
 		result.SavedIDs[placeID(place)] = true
 	}
+	if tx == nil {
+		return result
+	}
+
+	// Backfill the vendor's contact fields once per batch rather than after
+	// every saved place; it picks the best cached place either way.
+	if result.Saved > 0 {
+		if _, err := tx.ExecContext(ctx, "SAVEPOINT vendor_contact"); err != nil {
+			log.Printf("  contact backfill error for %s: %v", vendor.Name, err)
+		} else if err := backfillVendorContact(ctx, tx, vendor.ID); err != nil {
+			log.Printf("  contact backfill error for %s: %v", vendor.Name, err)
+			if _, err := tx.ExecContext(ctx, "ROLLBACK TO SAVEPOINT vendor_contact"); err != nil {
+				log.Printf("  rollback error for %s: %v", vendor.Name, err)
+			}
+		}
+	}
+	if err := tx.Commit(); err != nil {
+		log.Printf("  commit error for %s places of %s: %v", source, vendor.Name, err)
+		// Nothing was stored. SavedIDs still lists the matched places so a
+		// following prune keeps their existing rows.
+		result.Saved = 0
+	}
 
 	return result
 }
 
+// upsertVendorPlaceSavepoint runs upsertVendorPlace inside a savepoint of tx and
+// rolls back to it on failure, leaving the enclosing transaction usable.
+func upsertVendorPlaceSavepoint(ctx context.Context, tx *sql.Tx, vendor vendorRow, place foursquarePlace) error {
+	if _, err := tx.ExecContext(ctx, "SAVEPOINT vendor_place"); err != nil {
+		return err
+	}
+	if err := upsertVendorPlace(ctx, tx, vendor, place); err != nil {
+		if _, rbErr := tx.ExecContext(ctx, "ROLLBACK TO SAVEPOINT vendor_place"); rbErr != nil {
+			return fmt.Errorf("%v (rollback: %v)", err, rbErr)
+		}
+		return err
+	}
+	_, err := tx.ExecContext(ctx, "RELEASE SAVEPOINT vendor_place")
+	return err
+}
+
+// execer is the ExecContext method shared by *sql.DB and *sql.Tx.
+type execer interface {
+	ExecContext(ctx context.Context, query string, args ...interface{}) (sql.Result, error)
+}
+
 func searchFoursquareForVendor(ctx context.Context, client *http.Client, apiKey, version, fields, categoryIDs, query, near string, limit int, coverage *coverageBounds, maxSplitDepth int, requestSleep time.Duration) ([]foursquarePlace, coverageReport, error) {
 	if coverage == nil {
 		places, err := searchFoursquare(ctx, client, apiKey, version, fields, categoryIDs, query, near, nil, limit)
@@ -1393,7 +1455,7 @@ func bearerToken(apiKey string) string {
 	return "Bearer " + apiKey
 }
 
-func upsertVendorPlace(ctx context.Context, db *sql.DB, vendor vendorRow, place foursquarePlace) error {
+func upsertVendorPlace(ctx context.Context, db execer, vendor vendorRow, place foursquarePlace) error {
 	lat, lng := coordinates(place)
 	foursquareID := placeID(place)
 	source := placeSource(place)
@@ -1455,14 +1517,10 @@ func upsertVendorPlace(ctx context.Context, db *sql.DB, vendor vendorRow, place
 		nullableBool(place.Hours.OpenNow), string(hoursJSON), string(categoriesJSON), string(chainsJSON),
 		string(photosJSON), string(socialJSON), nullableFloat(place.Rating), nullableFloat(place.Popularity),
 		nullableInt(place.Price), lat, lng, place.Timezone, mapsURL, source, string(rawPlaceJSON))
-	if err != nil {
-		return err
-	}
-
-	return backfillVendorContact(ctx, db, vendor.ID)
+	return err
 }
 
-func backfillVendorContact(ctx context.Context, db *sql.DB, vendorID string) error {
+func backfillVendorContact(ctx context.Context, db execer, vendorID string) error {
 	_, err := db.ExecContext(ctx, `
 		UPDATE public."Vendor" v
 		SET phone = COALESCE(NULLIF(v.phone, ''), p.phone),
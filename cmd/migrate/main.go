@@ -407,15 +407,19 @@ func functionExists(ctx context.Context, db *sql.DB, functionName string) bool {
 	return err == nil && exists
 }
 
+// columnExists reads pg_attribute directly: information_schema.columns is a
+// privilege-filtered view over several catalogs and far slower to query, and
+// the probes call this many times per run.
 func columnExists(ctx context.Context, db *sql.DB, tableName, columnName string) bool {
 	var exists bool
 	err := db.QueryRowContext(ctx, `
 		SELECT EXISTS (
 			SELECT 1
-			FROM information_schema.columns
-			WHERE table_schema = 'public'
-			  AND table_name = $1
-			  AND column_name = $2
+			FROM pg_attribute
+			WHERE attrelid = to_regclass(format('public.%I', $1::text))
+			  AND attname = $2
+			  AND attnum > 0
+			  AND NOT attisdropped
 		)
 	`, tableName, columnName).Scan(&exists)
 	return err == nil && exists
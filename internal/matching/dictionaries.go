@@ -4,8 +4,10 @@ import (
 	_ "embed"
 	"encoding/json"
 	"log"
+	"slices"
 	"sort"
 	"strings"
+	"sync"
 )
 
 //go:embed data/ingredients.json
@@ -338,15 +340,22 @@ func fuzzyCanonicalFrom(s string, candidates []fuzzyAlias) string {
 		return ""
 	}
 	maxDist := fuzzyMaxDist(n)
+	// One pair of DP rows serves every candidate (lengths are within maxDist of n)
+	// instead of two fresh slices per comparison.
+	prev := make([]int, n+maxDist+1)
+	curr := make([]int, n+maxDist+1)
 	best, bestDist := "", maxDist+1
 	for _, fa := range candidates {
-		if d := len(fa.alias) - n; d > maxDist || -d > maxDist {
+		// Only a strictly closer alias can replace the current best, so the budget
+		// tightens as matches are found and later rows bail out sooner.
+		budget := bestDist - 1
+		if d := len(fa.alias) - n; d > budget || -d > budget {
 			continue
 		}
 		if fa.alias == s {
 			return fa.canonical // exact (cheap short-circuit)
 		}
-		dist := boundedLevenshtein(s, fa.alias, maxDist)
+		dist := boundedLevenshtein(s, fa.alias, budget, prev, curr)
 		if dist < bestDist {
 			bestDist, best = dist, fa.canonical
 		}
@@ -360,8 +369,44 @@ func fuzzyCanonicalFrom(s string, candidates []fuzzyAlias) string {
 // analyzeWithFuzzy is analyzeIngredients plus typo tolerance: leftover tokens are
 // fuzzy-matched to single-token ingredient aliases, and a short whole query that
 // found no ingredient is fuzzy-matched against full alias phrases.
+//
+// Results are memoized per normalized query: the dictionaries are embedded and
+// immutable, every search analyzes the same query twice (SearchConcepts and
+// ExpandQueryVariants), and popular queries repeat constantly, so the typo scan
+// over fuzzyTokenAliases need not be redone.
 func analyzeWithFuzzy(query string) (canon []string, leftover []string) {
 	norm := NormalizeText(query)
+	fuzzyAnalysisMu.Lock()
+	r, ok := fuzzyAnalysisCache[norm]
+	fuzzyAnalysisMu.Unlock()
+	if !ok {
+		r.canon, r.leftover = analyzeNormalizedWithFuzzy(norm)
+		fuzzyAnalysisMu.Lock()
+		if len(fuzzyAnalysisCache) >= fuzzyAnalysisCacheMax {
+			clear(fuzzyAnalysisCache)
+		}
+		fuzzyAnalysisCache[norm] = r
+		fuzzyAnalysisMu.Unlock()
+	}
+	// Callers get their own slices so the cached entry can't be mutated.
+	return slices.Clone(r.canon), slices.Clone(r.leftover)
+}
+
+// fuzzyAnalysisCacheMax bounds the memo; when full it is simply reset, which is
+// cheap and refills with the popular queries almost immediately.
+const fuzzyAnalysisCacheMax = 4096
+
+type fuzzyAnalysis struct {
+	canon    []string
+	leftover []string
+}
+
+var (
+	fuzzyAnalysisMu    sync.Mutex
+	fuzzyAnalysisCache = map[string]fuzzyAnalysis{}
+)
+
+func analyzeNormalizedWithFuzzy(norm string) (canon []string, leftover []string) {
 	canon, leftover = analyzeIngredients(norm, false)
 
 	if len(leftover) > 0 {
@@ -395,8 +440,9 @@ func analyzeWithFuzzy(query string) (canon []string, leftover []string) {
 }
 
 // boundedLevenshtein returns the edit distance between a and b, capped at max+1
-// (returns max+1 as soon as the whole row exceeds max).
-func boundedLevenshtein(a, b string, max int) int {
+// (returns max+1 as soon as the whole row exceeds max). prev and curr are
+// caller-provided DP rows, each at least len(b)+1 long.
+func boundedLevenshtein(a, b string, max int, prev, curr []int) int {
 	la, lb := len(a), len(b)
 	if la == 0 {
 		return lb
@@ -404,8 +450,7 @@ func boundedLevenshtein(a, b string, max int) int {
 	if lb == 0 {
 		return la
 	}
-	prev := make([]int, lb+1)
-	curr := make([]int, lb+1)
+	prev, curr = prev[:lb+1], curr[:lb+1]
 	for j := 0; j <= lb; j++ {
 		prev[j] = j
 	}
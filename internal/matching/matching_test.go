@@ -161,6 +161,18 @@ func TestSearchConceptsFuzzyResolvesTypos(t *testing.T) {
 	}
 }
 
+func TestAnalyzeWithFuzzyCacheReturnsIndependentSlices(t *testing.T) {
+	canon, _ := analyzeWithFuzzy("magnezium")
+	if !contains(canon, "magnezijum") {
+		t.Fatalf("typo 'magnezium' should resolve to 'magnezijum', got %v", canon)
+	}
+	canon[0] = "mutated"
+	// Second call is served from the memo and must not see the caller's edit.
+	if again, _ := analyzeWithFuzzy("Magnezium"); !contains(again, "magnezijum") {
+		t.Fatalf("cached analysis was mutated by a caller: %v", again)
+	}
+}
+
 func TestResidualSynonymUnifiesCaseinSpellings(t *testing.T) {
 	a := BuildGroupKey(GroupKeyInput{Core: "Prostar Casein", VolumeValue: 1000, VolumeUnit: "g", ProductID: "1"}).Key
 	b := BuildGroupKey(GroupKeyInput{Core: "Prostar Caseine", VolumeValue: 1000, VolumeUnit: "g", ProductID: "2"}).Key
@@ -1,6 +1,9 @@
 package main
 
-import "testing"
+import (
+	"testing"
+	"time"
+)
 
 func TestConvertHitsToGroupsDedupesVendorsAndRecalculatesPriceRange(t *testing.T) {
 	hits := []map[string]interface{}{
@@ -225,3 +228,20 @@ func TestConvertHitsToGroupsRanksByCoverageWithinRelevanceTier(t *testing.T) {
 		t.Fatalf("expected unrelated group last, got %q", got)
 	}
 }
+
+func TestWithStatementTimeout(t *testing.T) {
+	cases := []struct{ dsn, want string }{
+		{"postgres://u@h/db", "postgres://u@h/db?statement_timeout=30000"},
+		{"postgres://u@h/db?sslmode=disable", "postgres://u@h/db?sslmode=disable&statement_timeout=30000"},
+		{"host=h dbname=db", "host=h dbname=db statement_timeout=30000"},
+		{"postgres://u@h/db?statement_timeout=5000", "postgres://u@h/db?statement_timeout=5000"},
+	}
+	for _, c := range cases {
+		if got := withStatementTimeout(c.dsn, 30*time.Second); got != c.want {
+			t.Errorf("withStatementTimeout(%q) = %q, want %q", c.dsn, got, c.want)
+		}
+	}
+	if got := withStatementTimeout("postgres://u@h/db", 0); got != "postgres://u@h/db" {
+		t.Errorf("zero timeout should leave the DSN unchanged, got %q", got)
+	}
+}
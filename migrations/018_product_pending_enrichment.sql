@@ -0,0 +1,15 @@
+-- Migration: 018_product_pending_enrichment
+-- Work-queue index for ml/populate_missing_data.py. Its incremental batch fetch
+-- selects rows missing any enrichment column, keyset-paged by id. The existing
+-- idx_product_unprocessed only covers "processedAt" IS NULL, so the OR
+-- predicate fell back to scanning the (mostly processed) table on every batch.
+-- This partial index holds only the pending rows, so the fetch stays a short
+-- ordered index range scan however large the processed part of the table grows,
+-- and rows drop out of it as soon as a batch fills them in.
+
+CREATE INDEX IF NOT EXISTS idx_product_pending_enrichment
+    ON public."Product" USING btree (id)
+    WHERE ("processedAt" IS NULL
+           OR "normalizedName" IS NULL
+           OR "coreProductIdentity" IS NULL
+           OR "searchTokens" IS NULL);
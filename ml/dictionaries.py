@@ -12,6 +12,7 @@ Loads the SAME json files the Go backend embeds
 Build the json with:  python3 ml/scripts/build_dictionaries.py
 """
 
+import functools
 import json
 import re
 import unicodedata
@@ -27,28 +28,34 @@ _CYRILLIC = {
     "ф": "f", "х": "h", "ц": "c", "ч": "c", "џ": "dz", "ш": "s",
 }
 _LATIN = {"đ": "dj", "č": "c", "ć": "c", "š": "s", "ž": "z"}
+# One translate() pass replaces the per-character dict lookups; the key sets
+# don't overlap, so merging them keeps the original mapping.
+_TRANSLIT = str.maketrans({**_CYRILLIC, **_LATIN})
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+# Byte table mapping everything but [0-9a-z] to a space: for ASCII text,
+# bytes.translate + split is several times faster than the regex substitution.
+_ASCII_SEPARATORS = bytes(c if 48 <= c <= 57 or 97 <= c <= 122 else 32 for c in range(256))
 
 TRACK_A_CATEGORIES = {"supplement", "otc-drug", "otc", "drug"}
 
 
+# Brands, forms and titles are normalized several times per product (brand
+# detection, ingredient analysis, core identity) and brands repeat across the
+# whole catalog, so results are memoized.
+@functools.lru_cache(maxsize=65536)
 def normalize(text) -> str:
     """Mirror of Go matching.NormalizeText."""
     if not text:
         return ""
-    text = str(text).lower()
-    out = []
-    for ch in text:
-        if ch in _CYRILLIC:
-            out.append(_CYRILLIC[ch])
-        elif ch in _LATIN:
-            out.append(_LATIN[ch])
-        else:
-            out.append(ch)
-    text = "".join(out)
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(c for c in text if not unicodedata.combining(c))
-    text = re.sub(r"[^0-9a-z]+", " ", text)
-    return " ".join(text.split())
+    text = str(text).lower().translate(_TRANSLIT)
+    # Most titles are plain ASCII after transliteration; NFKD can't change
+    # those, so only decompose when something non-ASCII is left.
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        if not text.isascii():
+            return " ".join(_NON_ALNUM_RE.sub(" ", text).split())
+    return " ".join(text.encode("ascii").translate(_ASCII_SEPARATORS).decode("ascii").split())
 
 
 def _load(name: str) -> dict:
@@ -171,7 +178,13 @@ def is_brand(token: str) -> bool:
     return token in BRAND_STRIP and token not in BRAND_KEEP
 
 
-_MAX_BRAND_TOKENS = max((len(b.split()) for b in BRAND_STRIP), default=1)
+# First token of every brand phrase -> longest phrase starting with it. Most
+# title tokens start no brand at all, so detect_brand skips them outright and
+# only builds the n-grams that could actually match.
+_BRAND_FIRST_TOKEN_SPAN: Dict[str, int] = {}
+for _b in BRAND_STRIP:
+    _parts = _b.split()
+    _BRAND_FIRST_TOKEN_SPAN[_parts[0]] = max(_BRAND_FIRST_TOKEN_SPAN.get(_parts[0], 1), len(_parts))
 # Generic suffix words that are only a brand as part of a longer name
 # ("Ultimate Nutrition"), never standalone.
 _GENERIC_BRAND_SUFFIX = {
@@ -186,8 +199,11 @@ def detect_brand(title: str):
     from being mistaken for a brand."""
     tokens = normalize(title).split()
     best = None
-    for i in range(len(tokens)):
-        upper = min(_MAX_BRAND_TOKENS, len(tokens) - i)
+    for i, token in enumerate(tokens):
+        span = _BRAND_FIRST_TOKEN_SPAN.get(token)
+        if span is None:
+            continue
+        upper = min(span, len(tokens) - i)
         for n in range(upper, 0, -1):
             phrase = " ".join(tokens[i:i + n])
             if phrase in BRAND_STRIP and phrase not in BRAND_KEEP:
@@ -28,6 +28,13 @@ CYRILLIC_TO_LATIN = {
     "Ф": "f", "Х": "h", "Ц": "c", "Ч": "c", "Џ": "dz", "Ш": "s",
 }
 
+# Cyrillic and Serbian Latin diacritics folded in one str.translate pass.
+_LOOKUP_TRANSLIT = str.maketrans(CYRILLIC_TO_LATIN)
+_LOOKUP_TRANSLIT.update(SERBIAN_REPLACEMENTS)
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+# Byte table mapping everything but [0-9a-z] to a space, for the ASCII case.
+_ASCII_SEPARATORS = bytes(c if 48 <= c <= 57 or 97 <= c <= 122 else 32 for c in range(256))
+
 FORM_ALIASES = {
     "tab": "tablete",
     "tabl": "tablete",
@@ -104,11 +111,13 @@ def normalize_lookup_text(text: Optional[str]) -> str:
     if not text:
         return ""
 
-    transliterated = "".join(CYRILLIC_TO_LATIN.get(ch, ch) for ch in text)
-    transliterated = transliterated.translate(SERBIAN_REPLACEMENTS).lower()
-    transliterated = transliterated.replace("-", " ").replace("_", " ")
-    transliterated = re.sub(r"[^0-9a-z]+", " ", transliterated)
-    return " ".join(transliterated.split())
+    transliterated = text.translate(_LOOKUP_TRANSLIT).lower()
+    # Titles are nearly always ASCII after transliteration; bytes.translate +
+    # split does the separator collapse several times faster than the regex.
+    if transliterated.isascii():
+        return " ".join(
+            transliterated.encode("ascii").translate(_ASCII_SEPARATORS).decode("ascii").split())
+    return " ".join(_NON_ALNUM_RE.sub(" ", transliterated).split())
 
 
 def normalize_form(form: Optional[str]) -> Optional[str]:
@@ -173,6 +182,16 @@ def build_standardized_title(update: Dict[str, Any]) -> str:
     return " ".join(part for part in parts if part).strip()
 
 
+# Largest magnitudes the Product and ProductStandardization measure columns
+# accept, by payload field: numeric(15,6) leaves 9 integer digits and
+# quantityValue is int4. Values must lie strictly inside (-limit, limit).
+MEASURE_VALUE_LIMITS = {
+    "dosage_value": 1e9,
+    "quantity_value": 2**31,
+    "volume_value": 1e9,
+}
+
+
 def build_standardization_payload(update: Dict[str, Any]) -> Dict[str, Any]:
     standardized_title = build_standardized_title(update)
     normalized_lookup = normalize_lookup_text(standardized_title)
@@ -10,18 +10,22 @@ Updates both Product and ProductStandardization tables.
 import os
 import re
 import json
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import weakref
 import argparse
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, NamedTuple, Tuple
 from datetime import datetime
 
 import psycopg2
-from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from tqdm import tqdm
 
 from matching_utils import (
+    MEASURE_VALUE_LIMITS,
     build_search_metadata,
     build_standardization_payload,
     normalize_form,
@@ -72,14 +76,19 @@ QUANTITY_UNIT_PATTERN = (
     r"drazej\w*|pastil\w*|sas\w*|vrecic\w*|kesic\w*|ampul\w*|"
     r"komada|komad|kom|tab\w*"
 )
-FORM_PATTERN = re.compile(
-    r"\b(tablete|tableta|tabl|tab|kapsule|kapsula|kaps|capsules|capsule|caps|softgel|softgels|cps|"
-    r"sirup|sprej|spray|kapi|drops|gel|gela|krema|krem|cream|mast|losion|lotion|serum|"
-    r"rastvor|suspenzija|kesice|kesica|ampule|ampula|"
-    r"supozitorija|supozitorije|suppository|cepic|cepici|vaginaleta|vaginalete|vagitorija|vagitorije|vaginalne|vaginalnih|ovula|ovule|globula|globule|pesar|"
-    r"bombone|bombona|gumene|gumeni|gumenih|gumena|gumedica|gumedice|pektinske|pektinska|pektinski|gummy|gummies)\b",
-    re.IGNORECASE,
-)
+# Form words are matched as whole \w+ tokens, so a set lookup per title word
+# does what a \b(...)\b alternation did without retrying every alternative at
+# every position.
+FORM_WORDS = frozenset("""
+    tablete tableta tabl tab kapsule kapsula kaps capsules capsule caps softgel softgels cps
+    sirup sprej spray kapi drops gel gela krema krem cream mast losion lotion serum
+    rastvor suspenzija kesice kesica ampule ampula
+    supozitorija supozitorije suppository cepic cepici vaginaleta vaginalete vagitorija
+    vagitorije vaginalne vaginalnih ovula ovule globula globule pesar
+    bombone bombona gumene gumeni gumenih gumena gumedica gumedice pektinske pektinska
+    pektinski gummy gummies
+""".split())
+_WORD_RE = re.compile(r"\w+")
 QUANTITY_WITH_UNIT_RE = re.compile(
     rf"\b(\d{{1,4}})\s*({QUANTITY_UNIT_PATTERN})\b",
     re.IGNORECASE,
@@ -225,42 +234,32 @@ def extract_measures(title: str) -> Dict[str, Any]:
         "volume_value": None, "volume_unit": None,
     }
 
+    # Every numeric group below is \d+(?:[.,]\d+)?, which _parse_num always
+    # accepts, so the matches are converted without per-match try/except.
     m = PHARMA_DOSAGE_RE.search(t)
     if m:
-        try:
-            out["dosage_value"] = _parse_num(m.group(1))
-            out["dosage_unit"] = canon_unit(m.group(2))
-            out["dosage_text"] = m.group(0).strip()
-        except ValueError:
-            pass
+        out["dosage_value"] = _parse_num(m.group(1))
+        out["dosage_unit"] = canon_unit(m.group(2))
+        out["dosage_text"] = m.group(0).strip()
     if out["dosage_value"] is None:
         g = GRAM_RE.search(t)
         if g:
-            try:
-                val, unit = _parse_num(g.group(1)), canon_unit(g.group(2))
-                if unit == "g" and val <= 5.0:
-                    out["dosage_value"], out["dosage_unit"], out["dosage_text"] = val, "g", g.group(0).strip()
-            except ValueError:
-                pass
+            val, unit = _parse_num(g.group(1)), canon_unit(g.group(2))
+            if unit == "g" and val <= 5.0:
+                out["dosage_value"], out["dosage_unit"], out["dosage_text"] = val, "g", g.group(0).strip()
 
     # bottle volume (ml/l) — skip the denominator of a concentration like "10 mg/ml"
     for vm in VOLUME_RE.finditer(t):
         if vm.start() > 0 and t[vm.start() - 1] == "/":
             continue
-        try:
-            out["volume_value"] = _parse_num(vm.group(1))
-            out["volume_unit"] = canon_unit(vm.group(2))
-        except ValueError:
-            pass
+        out["volume_value"] = _parse_num(vm.group(1))
+        out["volume_unit"] = canon_unit(vm.group(2))
         break
 
     # large gram / kg -> container weight, stored on the volume dimension
     if out["volume_value"] is None:
         for g in GRAM_RE.finditer(t):
-            try:
-                val, unit = _parse_num(g.group(1)), canon_unit(g.group(2))
-            except ValueError:
-                continue
+            val, unit = _parse_num(g.group(1)), canon_unit(g.group(2))
             if unit == "kg":
                 out["volume_value"], out["volume_unit"] = val * 1000.0, "g"
                 break
@@ -359,6 +358,12 @@ _PACK_RES = [
 _QTY_FORM_RE = re.compile(rf'\b\d+\s*(?:{QUANTITY_UNIT_PATTERN}|obložen\w*|film\w*)\b', re.IGNORECASE)
 _SPF_RE = re.compile(r'\bspf\s*\d+\+?\b', re.IGNORECASE)
 _PERCENT_RE = re.compile(r'\b\d+(?:[.,]\d+)?\s*%')
+_CORE_PUNCT_RE = re.compile(r'[®™©()\[\]/\\,;:!?]')
+_CORE_MEASURE_RE = re.compile(r'\b\d+(?:[.,]\d+)?\s*(?:ml|l|kg|g|gr|gram|grama)\b', re.IGNORECASE)
+# Leftover tokens that are bare numbers ("60", "1.000") or alphanumeric codes
+# ("60kom", "b12x"); the latter are dropped unless they are a known alias.
+_NUMERIC_TOKEN_RE = re.compile(r'\d+(?:[.,]\d+)*')
+_ALNUM_CODE_RE = re.compile(r'(?:\d+[a-z]+|[a-z]+\d+\+?)')
 _KEEP_SHORT = {"c", "d", "b", "k", "e"}
 
 
@@ -366,18 +371,33 @@ def _strip_measures_for_core(title: str) -> str:
     """Remove dosage / volume / pack-size / SPF tokens from a title so only the
     product identity words remain."""
     t = pre_normalize_dosage(title)
-    t = re.sub(r'[®™©()\[\]/\\,;:!?]', ' ', t)
+    t = _CORE_PUNCT_RE.sub(' ', t)
+    # Every pattern below needs a digit, so titles without one (common for
+    # cosmetics) skip them all.
+    if not any(ch.isdigit() for ch in t):
+        return t
     t = _HYPHEN_CODE_RE.sub(r'\1\2', t)  # d-3 -> d3, omega-3 -> omega3
-    for pat in _PACK_RES:
-        t = pat.sub(' ', t)
+    # Three of the four pack patterns need a multiplication sign; titles without
+    # one (the majority) only run the "a 30"-style prefix pattern. The patterns
+    # stay sequential: one fused alternation strips chains like "3 x 10 x 5ml"
+    # differently, which would shift existing group identities.
+    if "x" in t or "х" in t or "×" in t:
+        for pat in _PACK_RES:
+            t = pat.sub(' ', t)
+    else:
+        t = _PACK_RES[2].sub(' ', t)
     t = PHARMA_DOSAGE_RE.sub(' ', t)
-    t = re.sub(r'\b\d+(?:[.,]\d+)?\s*(?:ml|l|kg|g|gr|gram|grama)\b', ' ', t, flags=re.IGNORECASE)
+    t = _CORE_MEASURE_RE.sub(' ', t)
     t = _QTY_FORM_RE.sub(' ', t)
     t = _SPF_RE.sub(' ', t)
     t = _PERCENT_RE.sub(' ', t)
     return t
 
 
+# Pure in (title, brand) and returns an immutable str/None. Each product hits it
+# twice (normalized name + core identity) and cross-vendor duplicate titles
+# repeat it again, so memoizing removes most of the regex/dictionary work.
+@functools.lru_cache(maxsize=100_000)
 def _extract_core_ingredient(title: str, brand: Optional[str] = None) -> Optional[str]:
     """Extract a clean, canonical product identity.
 
@@ -409,9 +429,9 @@ def _extract_core_ingredient(title: str, brand: Optional[str] = None) -> Optiona
             continue
         if tok in dictionaries.NOISE_WORDS or tok in dictionaries.FORM_WORDS:
             continue
-        if re.fullmatch(r'\d+(?:[.,]\d+)*', tok):
+        if _NUMERIC_TOKEN_RE.fullmatch(tok):
             continue
-        if re.fullmatch(r'(?:\d+[a-z]+|[a-z]+\d+\+?)', tok) and tok not in dictionaries.SINGLE_TOKEN_ALIASES:
+        if _ALNUM_CODE_RE.fullmatch(tok) and tok not in dictionaries.SINGLE_TOKEN_ALIASES:
             continue
         if len(tok) < 2 and tok not in _KEEP_SHORT:
             continue
@@ -505,19 +525,17 @@ def extract_entities_rule_based(title: str) -> Dict[str, Any]:
         "quantity_unit": None,
         "volume_value": None,
         "volume_unit": None,
-        "entities_found": []
     }
 
     brand = extract_brand_candidate(title)
     if brand:
         result["brand"] = brand
-        result["entities_found"].append({"label": "BRAND", "text": brand})
 
-    form_match = FORM_PATTERN.search(title)
-    if form_match:
-        normalized = normalize_form(form_match.group(1)) or form_match.group(1).lower()
-        result["form"] = normalized
-        result["entities_found"].append({"label": "FORM", "text": form_match.group(1)})
+    form_word = next(
+        (word for word in _WORD_RE.findall(title) if word.lower() in FORM_WORDS), None
+    )
+    if form_word:
+        result["form"] = normalize_form(form_word) or form_word.lower()
 
     measures = extract_measures(title)
     result["dosage_value"] = measures["dosage_value"]
@@ -525,8 +543,6 @@ def extract_entities_rule_based(title: str) -> Dict[str, Any]:
     result["dosage_text"] = measures["dosage_text"]
     result["volume_value"] = measures["volume_value"]
     result["volume_unit"] = measures["volume_unit"]
-    if measures["dosage_text"]:
-        result["entities_found"].append({"label": "DOSAGE", "text": measures["dosage_text"]})
 
     # Pick the first plausible count. A "number + form" match whose number is too
     # large to be a pack size (e.g. "2000 TABLETE" = 2000 IU in tablet form, not
@@ -539,7 +555,6 @@ def extract_entities_rule_based(title: str) -> Dict[str, Any]:
     if quantity_match:
         result["quantity_value"] = int(quantity_match.group(1))
         result["quantity_unit"] = quantity_match.group(2).lower()
-        result["entities_found"].append({"label": "QUANTITY", "text": quantity_match.group(0)})
 
         if not result["form"]:
             normalized = normalize_form(quantity_match.group(2))
@@ -550,9 +565,6 @@ def extract_entities_rule_based(title: str) -> Dict[str, Any]:
         if quantity_prefix_match and int(quantity_prefix_match.group(1)) <= MAX_PACK_COUNT:
             result["quantity_value"] = int(quantity_prefix_match.group(1))
             result["quantity_unit"] = "kom"
-            result["entities_found"].append(
-                {"label": "QUANTITY", "text": quantity_prefix_match.group(0)}
-            )
 
     # Large powders/tubs (>=400 g, or any kg) are not cosmetics: a "krema"/"cream"
     # form here is a flavor false-positive ("cookies & cream", "keks i krema"), so
@@ -569,29 +581,35 @@ def extract_entities_rule_based(title: str) -> Dict[str, Any]:
 
 
 def get_products_missing_data(conn, limit: int = BATCH_SIZE, update_all: bool = False,
-                               last_id: str = "") -> List[Dict]:
-    """Get products with missing extracted data."""
-    cur = conn.cursor()
+                               last_id: str = "") -> List[Tuple[str, str]]:
+    """Get products with missing extracted data.
 
+    Rows are claimed with FOR UPDATE SKIP LOCKED; the locks are held until
+    process_products commits the batch, so several workers can run against
+    the same table without picking up each other's rows.
+    """
+    # The claim query runs once per batch with the same shape, so it is
+    # prepared per connection like the batch writes.
     if update_all:
         # Get all products, paginated by last_id
-        query = """
+        ensure_prepared(conn, "claim_all", "text, integer", """
             SELECT id, title
             FROM "Product"
             WHERE title IS NOT NULL AND LENGTH(title) > 5
-              AND id > %s
+              AND id > $1
             ORDER BY id
-            LIMIT %s
-        """
-        cur.execute(query, (last_id, limit))
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        """)
+        name = "claim_all"
     else:
         # Get products missing key fields
-        query = """
+        ensure_prepared(conn, "claim_missing", "text, integer", """
             SELECT id, title
             FROM "Product"
             WHERE title IS NOT NULL
               AND LENGTH(title) > 5
-              AND id > %s
+              AND id > $1
               AND (
                   "processedAt" IS NULL
                   OR "normalizedName" IS NULL
@@ -599,14 +617,36 @@ def get_products_missing_data(conn, limit: int = BATCH_SIZE, update_all: bool =
                   OR "searchTokens" IS NULL
               )
             ORDER BY id
-            LIMIT %s
-        """
-        cur.execute(query, (last_id, limit))
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        """)
+        name = "claim_missing"
 
+    cur = conn.cursor()
+    cur.execute(f"EXECUTE {name}(%s, %s)", (last_id, limit))
     rows = cur.fetchall()
     cur.close()
 
-    return [{"id": row[0], "title": row[1]} for row in rows]
+    # (id, title) tuples straight from the cursor; a dict per row would only be
+    # unpacked again by the caller.
+    return rows
+
+
+# Statements already PREPAREd on each open connection. Prepared statements live
+# for the whole session, so each fixed-shape per-batch query is parsed and
+# planned once per connection instead of once per batch.
+_prepared_statements: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def ensure_prepared(conn, name: str, arg_types: str, query: str) -> None:
+    """PREPARE query as name on conn unless that was already done."""
+    prepared = _prepared_statements.setdefault(conn, set())
+    if name in prepared:
+        return
+    cur = conn.cursor()
+    cur.execute(f"PREPARE {name}({arg_types}) AS {query}")
+    cur.close()
+    prepared.add(name)
 
 
 def get_standardizations_for_titles(conn, titles: List[str]) -> Dict[str, Dict[str, Any]]:
@@ -615,8 +655,7 @@ def get_standardizations_for_titles(conn, titles: List[str]) -> Dict[str, Dict[s
         return {}
 
     normalized_titles = list({title.strip().lower() for title in titles if title and title.strip()})
-    cur = conn.cursor()
-    query = """
+    ensure_prepared(conn, "std_lookup", "text[]", """
         SELECT DISTINCT ON (LOWER(COALESCE("originalTitle", title)), LOWER(title))
             "originalTitle",
             title,
@@ -630,11 +669,12 @@ def get_standardizations_for_titles(conn, titles: List[str]) -> Dict[str, Dict[s
             "volumeValue",
             "volumeUnit"
         FROM "ProductStandardization"
-        WHERE LOWER(COALESCE("originalTitle", '')) = ANY(%s)
-           OR LOWER(title) = ANY(%s)
+        WHERE LOWER(COALESCE("originalTitle", '')) = ANY($1)
+           OR LOWER(title) = ANY($1)
         ORDER BY LOWER(COALESCE("originalTitle", title)), LOWER(title), confidence DESC, "updatedAt" DESC
-    """
-    cur.execute(query, (normalized_titles, normalized_titles))
+    """)
+    cur = conn.cursor()
+    cur.execute("EXECUTE std_lookup(%s)", (normalized_titles,))
     rows = cur.fetchall()
     cur.close()
 
@@ -663,108 +703,243 @@ def get_standardizations_for_titles(conn, titles: List[str]) -> Dict[str, Dict[s
     return standardizations
 
 
-def update_product_table(conn, updates: List[Dict]) -> int:
-    """Update the Product table with extracted data."""
-    if not updates:
+class ProductUpdate(NamedTuple):
+    """One enriched Product row, in the column order of update_product_table's
+    VALUES list so a batch can be sent as-is without per-row conversion."""
+    id: str
+    brand: Optional[str]
+    form: Optional[str]
+    dosage_value: Optional[float]
+    dosage_unit: Optional[str]
+    quantity_value: Optional[int]
+    quantity_unit: Optional[str]
+    volume_value: Optional[float]
+    volume_unit: Optional[str]
+    normalized_name: Optional[str]
+    core_product_identity: Optional[str]
+    search_tokens: List[str]
+
+
+def build_product_update(product_id: str, title: str, extracted: Dict[str, Any]) -> ProductUpdate:
+    """Post-process one extraction and derive the Product row written for it.
+
+    Module-level (and free of DB access) so process_products can run it in
+    worker processes.
+    """
+    # Post-process: fix misclassified dosage (ml→volume, find real pharma dosage)
+    extracted = post_process_extraction(extracted, title)
+
+    normalized_form = normalize_form(extracted.get("form")) or extracted.get("form")
+    extracted["form"] = normalized_form
+
+    # Generate normalized name and core identity
+    norm_name = generate_normalized_name(extracted, title)
+    core_identity = _extract_core_ingredient(title, extracted.get("brand"))
+    search_tokens, _ = build_search_metadata({
+        "title": title,
+        "brand": extracted.get("brand"),
+        "core_product_identity": core_identity,
+        "normalized_name": norm_name,
+        "dosage_value": extracted.get("dosage_value"),
+        "dosage_unit": extracted.get("dosage_unit"),
+        "volume_value": extracted.get("volume_value"),
+        "volume_unit": extracted.get("volume_unit"),
+        "quantity_value": extracted.get("quantity_value"),
+        "form": normalized_form,
+    })
+
+    # Add canonical ingredient tokens (compact + spaced) so concept-based
+    # search unifies spelling/language variants (magnezijum/magnesium/mg).
+    canon, _ = dictionaries.analyze_ingredients(
+        f"{title} {core_identity or ''}", track_a_only=False
+    )
+    extra_tokens = []
+    for c in canon:
+        extra_tokens.append(dictionaries.canonical_compact(c))
+        extra_tokens.extend(c.split())
+    # Category concept tokens (sun care, hand cream, shampoo, ...): a precise
+    # per-category regex over the raw title writes ONE unified token (e.g.
+    # "suncare") so a category-intent query ("krema za suncanje") resolves to it
+    # and recalls all members, regardless of how each product is titled.
+    for tok, pat in CATEGORY_PATTERNS:
+        if pat.search(title):
+            extra_tokens.append(tok)
+    if extra_tokens:
+        seen = set(search_tokens)
+        search_tokens = list(search_tokens) + [t for t in extra_tokens if t and t not in seen]
+
+    return ProductUpdate(
+        id=product_id,
+        brand=extracted["brand"],
+        form=normalized_form,
+        dosage_value=extracted["dosage_value"],
+        dosage_unit=extracted["dosage_unit"],
+        quantity_value=extracted["quantity_value"],
+        quantity_unit=extracted["quantity_unit"],
+        volume_value=extracted.get("volume_value"),
+        volume_unit=extracted.get("volume_unit"),
+        normalized_name=norm_name,
+        core_product_identity=core_identity,
+        search_tokens=search_tokens,
+    )
+
+
+def _column_limits(fields: Tuple[str, ...]) -> Dict[int, float]:
+    """MEASURE_VALUE_LIMITS keyed by each field's position in fields."""
+    return {fields.index(name): limit for name, limit in MEASURE_VALUE_LIMITS.items()}
+
+
+# One out-of-range measure value would abort a whole batched statement, so such
+# values are cleared before binding.
+_NUMERIC_COLUMN_LIMITS = _column_limits(ProductUpdate._fields)
+
+
+def _clear_out_of_range(columns: List[list], limits: Dict[int, float]) -> None:
+    """Set values outside (-limit, limit), or NaN, to None in the given columns."""
+    cleared = 0
+    for index, limit in limits.items():
+        column = columns[index]
+        for i, value in enumerate(column):
+            if value is not None and not -limit < value < limit:
+                column[i] = None
+                cleared += 1
+    if cleared:
+        logger.warning("Cleared %d out-of-range numeric values in batch", cleared)
+
+
+def _execute_sql(name: str, arg_types: Tuple[str, ...]) -> str:
+    """EXECUTE text for a statement prepared with arg_types.
+
+    Arguments keep explicit casts: psycopg2 renders an all-NULL column as
+    ARRAY[NULL,...], which resolves to text[] and would not coerce to the
+    parameter type on its own.
+    """
+    return "EXECUTE {}({})".format(name, ", ".join(f"%s::{t}" for t in arg_types))
+
+
+_PRODUCT_UPDATE_ARG_TYPES = (
+    "text[]", "text[]", "text[]", "double precision[]", "text[]", "integer[]",
+    "text[]", "numeric[]", "text[]", "text[]", "text[]", "text[]",
+)
+_PRODUCT_UPDATE_EXECUTE = _execute_sql("product_update", _PRODUCT_UPDATE_ARG_TYPES)
+
+
+def update_product_table(conn, rows: List[ProductUpdate]) -> int:
+    """Update the Product table with extracted data. The caller commits."""
+    if not rows:
         return 0
 
     cur = conn.cursor()
 
-    rows = [
-        (
-            update["id"],
-            update["brand"],
-            update["form"],
-            update["dosage_value"],
-            update["dosage_unit"],
-            update["quantity_value"],
-            update["quantity_unit"],
-            update.get("volume_value"),
-            update.get("volume_unit"),
-            update.get("normalized_name"),
-            update.get("core_product_identity"),
-            update.get("search_tokens"),
-        )
-        for update in updates
-    ]
-
     # Direct assignment (no COALESCE): a re-extraction must fully overwrite, incl.
     # clearing a field to NULL when the new extraction finds nothing — COALESCE
     # would otherwise preserve stale values from a previous (noisier) run.
-    query = """
+    #
+    # The batch is bound as one array per column and expanded with unnest(), so
+    # the statement text is the same for every batch regardless of its size.
+    # Postgres arrays must be rectangular, so each row's token list travels as a
+    # text[] literal and is cast back per row. Fixed text also means it can be
+    # prepared once per connection and only executed per batch.
+    #
+    # The skip-unchanged comparison rounds the values to the columns' numeric(15,6)
+    # first, as the assignment does; otherwise a value with more than six decimals
+    # never equals what was stored and the row is rewritten on every run.
+    ensure_prepared(conn, "product_update", ", ".join(_PRODUCT_UPDATE_ARG_TYPES), """
         UPDATE "Product" AS p SET
-            "extractedBrand" = v.brand::text,
-            form = v.form::text,
-            "dosageValue" = v.dosage_value::double precision,
-            "dosageUnit" = v.dosage_unit::text,
-            "quantityValue" = v.quantity_value::integer,
-            "quantityUnit" = v.quantity_unit::text,
-            "volumeValue" = v.volume_value::numeric,
-            "volumeUnit" = v.volume_unit::text,
-            "normalizedName" = v.normalized_name::text,
-            "coreProductIdentity" = v.core_product_identity::text,
+            "extractedBrand" = v.brand,
+            form = v.form,
+            "dosageValue" = v.dosage_value,
+            "dosageUnit" = v.dosage_unit,
+            "quantityValue" = v.quantity_value,
+            "quantityUnit" = v.quantity_unit,
+            "volumeValue" = v.volume_value,
+            "volumeUnit" = v.volume_unit,
+            "normalizedName" = v.normalized_name,
+            "coreProductIdentity" = v.core_product_identity,
             "searchTokens" = v.search_tokens::text[],
             "processedAt" = CURRENT_TIMESTAMP,
             "updatedAt" = CURRENT_TIMESTAMP
-        FROM (VALUES %s) AS v(
+        FROM unnest($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12) AS v(
             id, brand, form, dosage_value, dosage_unit, quantity_value, quantity_unit,
             volume_value, volume_unit, normalized_name, core_product_identity,
             search_tokens
         )
         WHERE p.id = v.id
-        RETURNING p.id
-    """
-
-    execute_values(cur, query, rows, page_size=100)
+          AND (
+              p."processedAt" IS NULL
+              OR (p."extractedBrand", p.form, p."dosageValue", p."dosageUnit",
+                  p."quantityValue", p."quantityUnit", p."volumeValue", p."volumeUnit",
+                  p."normalizedName", p."coreProductIdentity", p."searchTokens")
+                 IS DISTINCT FROM
+                 (v.brand, v.form, v.dosage_value::numeric(15,6), v.dosage_unit,
+                  v.quantity_value, v.quantity_unit, v.volume_value::numeric(15,6),
+                  v.volume_unit, v.normalized_name, v.core_product_identity,
+                  v.search_tokens::text[])
+          )
+    """)
+
+    columns = [list(column) for column in zip(*rows)]
+    columns[-1] = [_text_array_literal(tokens) for tokens in columns[-1]]
+    _clear_out_of_range(columns, _NUMERIC_COLUMN_LIMITS)
+
+    # A re-run mostly reproduces what is already stored: rows whose values are
+    # unchanged are skipped (no dead tuple, no index churn).
+    cur.execute(_PRODUCT_UPDATE_EXECUTE, columns)
     updated = cur.rowcount
-    conn.commit()
     cur.close()
 
     return updated
 
 
+def _text_array_literal(values: Optional[List[str]]) -> Optional[str]:
+    """Render values as a Postgres text[] input literal ('{"a","b"}')."""
+    if values is None:
+        return None
+    quoted = (
+        '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        for value in values
+    )
+    return "{" + ",".join(quoted) + "}"
+
+
+# Row layout of the standardization upsert; "source" is the pipeline source and
+# the rest are build_standardization_payload keys.
+_STANDARDIZATION_UPSERT_COLUMNS = (
+    "title", "original_title", "normalized_name", "brand", "form",
+    "dosage_value", "dosage_unit", "quantity_value", "quantity_unit",
+    "volume_value", "volume_unit", "source",
+)
+_STANDARDIZATION_COLUMN_LIMITS = _column_limits(_STANDARDIZATION_UPSERT_COLUMNS)
+_STANDARDIZATION_UPSERT_ARG_TYPES = (
+    "text[]", "text[]", "text[]", "text[]", "text[]", "numeric[]",
+    "text[]", "integer[]", "text[]", "numeric[]", "text[]", "text[]",
+)
+_STANDARDIZATION_UPSERT_EXECUTE = _execute_sql(
+    "standardization_upsert", _STANDARDIZATION_UPSERT_ARG_TYPES)
+
+
 def update_standardization_table(conn, updates: List[Dict]) -> int:
-    """Update or insert into ProductStandardization table."""
+    """Update or insert into ProductStandardization table. The caller commits."""
     if not updates:
         return 0
 
-    cur = conn.cursor()
-
-    # Deduplicate by title to avoid "ON CONFLICT DO UPDATE command cannot affect row a second time"
-    seen_titles = set()
-    unique_updates = []
+    # Deduplicate on the conflict key to avoid "ON CONFLICT DO UPDATE command
+    # cannot affect row a second time"; the first update for a key wins.
+    rows = {}
     for update in updates:
-        if update["title"] not in seen_titles:
-            seen_titles.add(update["title"])
-            unique_updates.append(update)
-
-    rows = []
-    for update in unique_updates:
         payload = build_standardization_payload(update)
-        rows.append(
-            (
-                payload["title"],
-                payload["original_title"],
-                payload["normalized_name"],
-                payload["brand"],
-                payload["form"],
-                payload["dosage_value"],
-                payload["dosage_unit"],
-                payload["quantity_value"],
-                payload["quantity_unit"],
-                payload["volume_value"],
-                payload["volume_unit"],
-                0.8,
-                update.get("pipeline_source", "rules_pipeline"),
-            )
-        )
+        key = (payload["original_title"], payload["title"])
+        if key in rows:
+            continue
+        payload["source"] = update.get("pipeline_source", "rules_pipeline")
+        rows[key] = tuple(payload[column] for column in _STANDARDIZATION_UPSERT_COLUMNS)
 
     if not rows:
-        cur.close()
         return 0
 
-    # Use upsert pattern
-    query = """
+    # Same shape as update_product_table: one array per column, one prepared
+    # statement per batch, so rowcount covers every upserted row.
+    ensure_prepared(conn, "standardization_upsert", ", ".join(_STANDARDIZATION_UPSERT_ARG_TYPES), """
         INSERT INTO "ProductStandardization" (
             title, "originalTitle", "normalizedName",
             "brandName", "productForm",
@@ -772,7 +947,19 @@ def update_standardization_table(conn, updates: List[Dict]) -> int:
             "quantityValue", "quantityUnit",
             "volumeValue", "volumeUnit",
             confidence, source
-        ) VALUES %s
+        )
+        SELECT
+            v.title, v.original_title, v.normalized_name,
+            v.brand, v.form,
+            v.dosage_value, v.dosage_unit,
+            v.quantity_value, v.quantity_unit,
+            v.volume_value, v.volume_unit,
+            0.8, v.source
+        FROM unnest($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12) AS v(
+            title, original_title, normalized_name, brand, form,
+            dosage_value, dosage_unit, quantity_value, quantity_unit,
+            volume_value, volume_unit, source
+        )
         ON CONFLICT ("originalTitle", title) DO UPDATE SET
             "normalizedName" = COALESCE(EXCLUDED."normalizedName", "ProductStandardization"."normalizedName"),
             "brandName" = COALESCE(EXCLUDED."brandName", "ProductStandardization"."brandName"),
@@ -785,34 +972,60 @@ def update_standardization_table(conn, updates: List[Dict]) -> int:
             "volumeUnit" = COALESCE(EXCLUDED."volumeUnit", "ProductStandardization"."volumeUnit"),
             confidence = GREATEST(EXCLUDED.confidence, "ProductStandardization".confidence),
             "updatedAt" = CURRENT_TIMESTAMP
-        RETURNING "originalTitle"
-    """
+    """)
 
-    execute_values(cur, query, rows, page_size=100)
+    columns = [list(column) for column in zip(*rows.values())]
+    _clear_out_of_range(columns, _STANDARDIZATION_COLUMN_LIMITS)
+
+    cur = conn.cursor()
+    cur.execute(_STANDARDIZATION_UPSERT_EXECUTE, columns)
     updated = cur.rowcount
-    conn.commit()
     cur.close()
 
     return updated
 
 
+def estimate_row_count(conn, query: str) -> int:
+    """Return the planner's row estimate for query without executing it."""
+    cur = conn.cursor()
+    cur.execute("EXPLAIN (FORMAT JSON) " + query)
+    plan = cur.fetchone()[0]
+    cur.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# A standardization missing any of these is completed from rule-based extraction
+# (and written back to ProductStandardization).
+_STANDARDIZATION_FIELDS = (
+    "brand", "form", "dosage_value", "dosage_unit",
+    "quantity_value", "quantity_unit", "volume_value", "volume_unit",
+)
+
+
 def process_products(conn, limit: int = 0, update_all: bool = False,
-                     update_standardization: bool = True):
-    """Process products and extract missing data."""
+                     update_standardization: bool = True, jobs: int = 1):
+    """Process products and extract missing data.
 
-    # Get total count for progress tracking
-    cur = conn.cursor()
+    With jobs > 1, rule-based extraction and enrichment for each batch are spread
+    over a pool of worker processes; fetching and writing stay on this process's
+    connection.
+    """
+
+    # Planner estimate for progress tracking; an exact COUNT(*) here would be an
+    # extra full scan of "Product" before the first batch is even fetched.
     if update_all:
-        cur.execute('SELECT COUNT(*) FROM "Product" WHERE title IS NOT NULL AND LENGTH(title) > 5')
+        total_to_process = estimate_row_count(
+            conn, 'SELECT 1 FROM "Product" WHERE title IS NOT NULL AND LENGTH(title) > 5')
     else:
-        cur.execute('''SELECT COUNT(*) FROM "Product"
-                       WHERE title IS NOT NULL AND LENGTH(title) > 5
-                       AND ("processedAt" IS NULL
-                            OR "normalizedName" IS NULL OR "coreProductIdentity" IS NULL
-                            OR "searchTokens" IS NULL)''')
-    total_to_process = cur.fetchone()[0]
-    cur.close()
-    logger.info(f"Total products to process: {total_to_process}")
+        total_to_process = estimate_row_count(
+            conn, '''SELECT 1 FROM "Product"
+                     WHERE title IS NOT NULL AND LENGTH(title) > 5
+                     AND ("processedAt" IS NULL
+                          OR "normalizedName" IS NULL OR "coreProductIdentity" IS NULL
+                          OR "searchTokens" IS NULL)''')
+    logger.info("Estimated products to process: ~%d", total_to_process)
 
     total_processed = 0
     total_with_brand = 0
@@ -822,183 +1035,150 @@ def process_products(conn, limit: int = 0, update_all: bool = False,
     total_from_standardization = 0
     last_id = ""  # Track last processed ID for pagination
 
-    while True:
-        # Get batch of products
-        products = get_products_missing_data(conn, BATCH_SIZE, update_all, last_id)
-
-        if not products:
-            logger.info("No more products to process")
-            break
+    # One bar for the whole run, advanced once per batch. disable=None turns it
+    # off when stderr isn't a TTY (cron/CI logs get the batch summary lines).
+    progress = tqdm(total=total_to_process, desc="Processing products", unit="product",
+                    mininterval=1.0, smoothing=0, disable=None)
+
+    # Extraction is pure-Python regex/dictionary work and GIL-bound, so extra
+    # cores only help as separate processes. Workers are forked once per run and
+    # inherit the loaded dictionaries; they never touch the DB connection. Both
+    # the pool and the bar are context managers so an error or Ctrl-C in any
+    # batch still shuts the workers down and closes the bar.
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else contextlib.nullcontext()
+    with pool as executor, progress:
+        while True:
+            # Get batch of products
+            products = get_products_missing_data(conn, BATCH_SIZE, update_all, last_id)
+
+            if not products:
+                logger.info("No more products to process")
+                break
 
-        progress_pct = (total_processed / total_to_process * 100) if total_to_process > 0 else 0
-        logger.info(f"Processing batch of {len(products)} products ({total_processed}/{total_to_process}, {progress_pct:.1f}%)")
-
-        updates = []
-        standardization_updates = []
-        titles = [product["title"] for product in products]
-        standardizations = get_standardizations_for_titles(conn, titles)
-
-        inference_indexes: List[int] = []
-        inference_titles: List[str] = []
-        standardization_missing_by_index: Dict[int, bool] = {}
-
-        for idx, product in enumerate(products):
-            standardization = standardizations.get(product["title"]) or standardizations.get(product["title"].lower())
-            standardization_missing = False
-            if standardization:
-                total_from_standardization += 1
-                standardization_missing = any(
-                    standardization[field] is None
-                    for field in [
-                        "brand",
-                        "form",
-                        "dosage_value",
-                        "dosage_unit",
-                        "quantity_value",
-                        "quantity_unit",
-                        "volume_value",
-                        "volume_unit",
-                    ]
-                )
-            standardization_missing_by_index[idx] = standardization_missing
-
-            if not standardization or standardization_missing:
-                inference_indexes.append(idx)
-                inference_titles.append(product["title"])
-
-        inferred_by_index: Dict[int, Dict[str, Any]] = {}
-        if inference_titles:
-            for i, title in enumerate(
-                tqdm(inference_titles, total=len(inference_titles), desc="Extracting entities")
-            ):
-                inferred_by_index[inference_indexes[i]] = extract_entities_rule_based(title)
-
-        for idx, product in enumerate(products):
-            standardization = standardizations.get(product["title"]) or standardizations.get(product["title"].lower())
-            extracted = None
-
-            if standardization and not standardization_missing_by_index[idx]:
-                extracted = {
-                    "brand": standardization["brand"],
-                    "form": standardization["form"],
-                    "dosage_value": standardization["dosage_value"],
-                    "dosage_unit": standardization["dosage_unit"],
-                    "dosage_text": None,
-                    "quantity_value": standardization["quantity_value"],
-                    "quantity_unit": standardization["quantity_unit"],
-                    "volume_value": standardization.get("volume_value"),
-                    "volume_unit": standardization.get("volume_unit"),
-                }
-            else:
-                inferred = inferred_by_index.get(idx) or extract_entities_rule_based(product["title"])
+            progress_pct = (total_processed / total_to_process * 100) if total_to_process > 0 else 0
+            logger.info("Processing batch of %d products (%d/~%d, %.1f%%)",
+                        len(products), total_processed, total_to_process, progress_pct)
+
+            updates = []
+            standardization_updates = []
+            product_ids = [product_id for product_id, _ in products]
+            titles = [title for _, title in products]
+            standardizations = get_standardizations_for_titles(conn, titles)
+
+            # Resolve each product's standardization once; the passes below index
+            # into these lists instead of repeating the two-key lookup.
+            matched: List[Optional[Dict[str, Any]]] = []
+            needs_inference: List[bool] = []
+            for title in titles:
+                standardization = standardizations.get(title) or standardizations.get(title.lower())
+                matched.append(standardization)
                 if standardization:
+                    total_from_standardization += 1
+                    needs_inference.append(
+                        any(standardization[field] is None for field in _STANDARDIZATION_FIELDS))
+                else:
+                    needs_inference.append(True)
+
+            # The same title is often listed by several vendors; extract each
+            # distinct title once and share the result (post_process_extraction
+            # copies before mutating, so sharing is safe).
+            unique_titles = list(dict.fromkeys(
+                title for title, needed in zip(titles, needs_inference) if needed))
+            if executor and len(unique_titles) > 1:
+                inferred = executor.map(extract_entities_rule_based, unique_titles,
+                                        chunksize=max(1, len(unique_titles) // (jobs * 4)))
+            else:
+                inferred = map(extract_entities_rule_based, unique_titles)
+            inferred_by_title: Dict[str, Dict[str, Any]] = dict(zip(unique_titles, inferred))
+
+            extracted_rows: List[Dict[str, Any]] = []
+            for title, standardization, needed in zip(titles, matched, needs_inference):
+                if not needed:
                     extracted = {
-                        "brand": standardization["brand"] or inferred["brand"],
-                        "form": standardization["form"] or inferred["form"],
-                        "dosage_value": standardization["dosage_value"] or inferred["dosage_value"],
-                        "dosage_unit": standardization["dosage_unit"] or inferred["dosage_unit"],
-                        "dosage_text": inferred["dosage_text"],
-                        "quantity_value": standardization["quantity_value"] or inferred["quantity_value"],
-                        "quantity_unit": standardization["quantity_unit"] or inferred["quantity_unit"],
-                        "volume_value": standardization.get("volume_value") or inferred.get("volume_value"),
-                        "volume_unit": standardization.get("volume_unit") or inferred.get("volume_unit"),
+                        "brand": standardization["brand"],
+                        "form": standardization["form"],
+                        "dosage_value": standardization["dosage_value"],
+                        "dosage_unit": standardization["dosage_unit"],
+                        "dosage_text": None,
+                        "quantity_value": standardization["quantity_value"],
+                        "quantity_unit": standardization["quantity_unit"],
+                        "volume_value": standardization.get("volume_value"),
+                        "volume_unit": standardization.get("volume_unit"),
                     }
                 else:
-                    extracted = inferred
-
-            # Post-process: fix misclassified dosage (ml→volume, find real pharma dosage)
-            extracted = post_process_extraction(extracted, product["title"])
-
-            normalized_form = normalize_form(extracted.get("form")) or extracted.get("form")
-            extracted["form"] = normalized_form
-
-            # Generate normalized name and core identity
-            norm_name = generate_normalized_name(extracted, product["title"])
-            core_identity = _extract_core_ingredient(product["title"], extracted.get("brand"))
-            search_tokens, _ = build_search_metadata({
-                "title": product["title"],
-                "brand": extracted.get("brand"),
-                "core_product_identity": core_identity,
-                "normalized_name": norm_name,
-                "dosage_value": extracted.get("dosage_value"),
-                "dosage_unit": extracted.get("dosage_unit"),
-                "volume_value": extracted.get("volume_value"),
-                "volume_unit": extracted.get("volume_unit"),
-                "quantity_value": extracted.get("quantity_value"),
-                "form": normalized_form,
-            })
-
-            # Add canonical ingredient tokens (compact + spaced) so concept-based
-            # search unifies spelling/language variants (magnezijum/magnesium/mg).
-            canon, _ = dictionaries.analyze_ingredients(
-                f"{product['title']} {core_identity or ''}", track_a_only=False
-            )
-            extra_tokens = []
-            for c in canon:
-                extra_tokens.append(dictionaries.canonical_compact(c))
-                extra_tokens.extend(c.split())
-            # Category concept tokens (sun care, hand cream, shampoo, ...): a precise
-            # per-category regex over the raw title writes ONE unified token (e.g.
-            # "suncare") so a category-intent query ("krema za suncanje") resolves to it
-            # and recalls all members, regardless of how each product is titled.
-            for tok, pat in CATEGORY_PATTERNS:
-                if pat.search(product["title"]):
-                    extra_tokens.append(tok)
-            if extra_tokens:
-                seen = set(search_tokens)
-                search_tokens = list(search_tokens) + [t for t in extra_tokens if t and t not in seen]
-
-            update_record = {
-                "id": product["id"],
-                "title": product["title"],
-                "brand": extracted["brand"],
-                "form": normalized_form,
-                "dosage_value": extracted["dosage_value"],
-                "dosage_unit": extracted["dosage_unit"],
-                "dosage_text": extracted.get("dosage_text"),
-                "quantity_value": extracted["quantity_value"],
-                "quantity_unit": extracted["quantity_unit"],
-                "volume_value": extracted.get("volume_value"),
-                "volume_unit": extracted.get("volume_unit"),
-                "normalized_name": norm_name,
-                "core_product_identity": core_identity,
-                "search_tokens": search_tokens,
-                "pipeline_source": "rules_pipeline",
-            }
-
-            updates.append(update_record)
-            if not standardization or standardization_missing:
-                standardization_updates.append(update_record)
-
-            # Count extractions
-            if extracted["brand"]:
-                total_with_brand += 1
-            if extracted["dosage_value"]:
-                total_with_dosage += 1
-            if extracted["form"]:
-                total_with_form += 1
-            if extracted["quantity_value"]:
-                total_with_quantity += 1
-
-        # Update Product table
-        updated_products = update_product_table(conn, updates)
-        logger.info(f"Updated {updated_products} products")
-
-        # Update ProductStandardization table
-        if update_standardization and standardization_updates:
-            updated_std = update_standardization_table(conn, standardization_updates)
-            logger.info(f"Updated {updated_std} standardization records")
-
-        total_processed += len(products)
-
-        # Advance pagination cursor for both modes so each row is handled once per run.
-        if products:
-            last_id = products[-1]["id"]
-
-        # Check limit
-        if limit > 0 and total_processed >= limit:
-            logger.info(f"Reached limit of {limit} products")
-            break
+                    inferred = inferred_by_title[title]
+                    if standardization:
+                        extracted = {
+                            "brand": standardization["brand"] or inferred["brand"],
+                            "form": standardization["form"] or inferred["form"],
+                            "dosage_value": standardization["dosage_value"] or inferred["dosage_value"],
+                            "dosage_unit": standardization["dosage_unit"] or inferred["dosage_unit"],
+                            "dosage_text": inferred["dosage_text"],
+                            "quantity_value": standardization["quantity_value"] or inferred["quantity_value"],
+                            "quantity_unit": standardization["quantity_unit"] or inferred["quantity_unit"],
+                            "volume_value": standardization.get("volume_value") or inferred.get("volume_value"),
+                            "volume_unit": standardization.get("volume_unit") or inferred.get("volume_unit"),
+                        }
+                    else:
+                        extracted = inferred
+
+                extracted_rows.append(extracted)
+
+            # Enrichment (post-processing, names, core identity, search tokens) is the
+            # same kind of GIL-bound work as extraction, so it goes through the pool too.
+            if executor and len(products) > 1:
+                rows = executor.map(build_product_update, product_ids, titles, extracted_rows,
+                                    chunksize=max(1, len(products) // (jobs * 4)))
+            else:
+                rows = map(build_product_update, product_ids, titles, extracted_rows)
+
+            for title, update_row, needed in zip(titles, rows, needs_inference):
+                updates.append(update_row)
+                # The keyed dict is only needed for the (smaller) standardization upsert.
+                if needed:
+                    standardization_record = update_row._asdict()
+                    standardization_record["title"] = title
+                    standardization_record["pipeline_source"] = "rules_pipeline"
+                    standardization_updates.append(standardization_record)
+
+                # Count extractions
+                if update_row.brand:
+                    total_with_brand += 1
+                if update_row.dosage_value:
+                    total_with_dosage += 1
+                if update_row.form:
+                    total_with_form += 1
+                if update_row.quantity_value:
+                    total_with_quantity += 1
+
+            # Update Product table
+            updated_products = update_product_table(conn, updates)
+
+            # Update ProductStandardization table
+            updated_std = 0
+            if update_standardization and standardization_updates:
+                updated_std = update_standardization_table(conn, standardization_updates)
+
+            # One commit per batch covers both writes (one WAL flush instead of two)
+            # and releases the rows claimed by get_products_missing_data.
+            conn.commit()
+
+            # One summary line per batch; lazy %-formatting keeps the loop free of
+            # string building when INFO is filtered out.
+            logger.info("Batch done: %d products, %d updated, %d standardization records",
+                        len(products), updated_products, updated_std)
+
+            total_processed += len(products)
+            progress.update(len(products))
+
+            # Advance pagination cursor for both modes so each row is handled once per run.
+            if products:
+                last_id = product_ids[-1]
+
+            # Check limit
+            if limit > 0 and total_processed >= limit:
+                logger.info("Reached limit of %d products", limit)
+                break
 
     return {
         "total_processed": total_processed,
@@ -1030,8 +1210,15 @@ def main():
         "--dry-run", action="store_true",
         help="Show what would be done without making changes"
     )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Worker processes for extraction and enrichment "
+             "(default: 1, in-process; 0 = one per CPU)"
+    )
 
     args = parser.parse_args()
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
 
     logger.info("=" * 60)
     logger.info("Populate Missing Product Data")
@@ -1058,20 +1245,20 @@ def main():
         row = cur.fetchone()
         cur.close()
 
-        logger.info(f"\nCurrent database stats:")
+        logger.info("\nCurrent database stats:")
         logger.info(f"  Total products: {row[0]}")
         logger.info(f"  With brand: {row[1]} ({row[1]/row[0]*100:.1f}%)")
         logger.info(f"  With form: {row[2]} ({row[2]/row[0]*100:.1f}%)")
         logger.info(f"  With dosage: {row[3]} ({row[3]/row[0]*100:.1f}%)")
         logger.info(f"  With quantity: {row[4]} ({row[4]/row[0]*100:.1f}%)")
-        logger.info(f"\nMissing data:")
+        logger.info("\nMissing data:")
         logger.info(f"  Without brand: {row[0] - row[1]}")
         logger.info(f"  Without form: {row[0] - row[2]}")
         logger.info(f"  Without dosage: {row[0] - row[3]}")
         logger.info(f"  Without quantity: {row[0] - row[4]}")
 
         # Test on a few examples
-        logger.info(f"\nSample extractions:")
+        logger.info("\nSample extractions:")
         cur = conn.cursor()
         cur.execute("""
             SELECT title FROM "Product"
@@ -1096,7 +1283,8 @@ def main():
             conn,
             limit=args.limit,
             update_all=args.all,
-            update_standardization=not args.no_standardization
+            update_standardization=not args.no_standardization,
+            jobs=args.jobs,
         )
 
         duration = datetime.now() - start_time
@@ -1107,7 +1295,7 @@ def main():
         logger.info(f"Duration: {duration}")
         logger.info(f"Total processed: {stats['total_processed']}")
         if stats['total_processed'] > 0:
-            logger.info(f"Extraction rates:")
+            logger.info("Extraction rates:")
             logger.info(f"  Brand: {stats['with_brand']} ({stats['with_brand']/stats['total_processed']*100:.1f}%)")
             logger.info(f"  Dosage: {stats['with_dosage']} ({stats['with_dosage']/stats['total_processed']*100:.1f}%)")
             logger.info(f"  Form: {stats['with_form']} ({stats['with_form']/stats['total_processed']*100:.1f}%)")
@@ -32,7 +32,6 @@ import tempfile
 from pathlib import Path
 
 import psycopg2
-from psycopg2.extras import execute_values
 
 # anthropic is only needed for the LLM pass; --overrides-only must run without it
 # (and without an API key). Import lazily inside the functions that use it.
@@ -154,48 +153,78 @@ LINE_OVERRIDES = ROOT / "ml" / "data" / "line_canonical_overrides.json"
 PROBIOTIK_OVERRIDES = ROOT / "ml" / "data" / "probiotik_title_overrides.json"
 
 
-def apply_probiotik_overrides(cur) -> int:
-    """Set canonicalIdentity for probiotik products by matching their normalized title
-    against the curated probiotik override map. NO measure guard (probiotik is sold by
-    count, not size); scoped to titles containing probiotik/probiotic so the count-based
-    relaxation can't affect bars/diapers/etc. Returns rows updated."""
-    if not PROBIOTIK_OVERRIDES.exists():
+def _match_overrides(cur, ov: dict, query: str) -> list:
+    """Run query (selecting id, text) and return (id, override) pairs for rows whose
+    normalized text is a key of ov. Rows stream through a named (server-side)
+    cursor in the caller's transaction instead of being fetched all at once."""
+    scan = cur.connection.cursor(name="override_scan")
+    scan.itersize = 5000
+    scan.execute(query)
+    pairs = []
+    for pid, text in scan:
+        cid = ov.get(d.normalize(text))
+        if cid is not None:
+            pairs.append((pid, cid))
+    scan.close()
+    return pairs
+
+
+def _write_identities(cur, pairs) -> int:
+    """Set canonicalIdentity from (id, canonical) pairs in one statement, skipping
+    rows that already hold that value. Returns rows changed."""
+    if not pairs:
         return 0
+    ids, cids = zip(*pairs)
+    cur.execute(
+        '''UPDATE "Product" p SET "canonicalIdentity" = v.cid
+           FROM unnest(%s::text[], %s::text[]) AS v(id, cid)
+           WHERE p.id = v.id AND p."canonicalIdentity" IS DISTINCT FROM v.cid''',
+        (list(ids), list(cids)),
+    )
+    return cur.rowcount
+
+
+def probiotik_override_pairs(cur) -> list:
+    """(id, canonical) pairs for probiotik products whose normalized title is in the
+    curated probiotik override map. NO measure guard (probiotik is sold by count, not
+    size); scoped to titles containing probiotik/probiotic so the count-based
+    relaxation can't affect bars/diapers/etc."""
+    if not PROBIOTIK_OVERRIDES.exists():
+        return []
     ov = json.loads(PROBIOTIK_OVERRIDES.read_text())
-    cur.execute('''SELECT id, title FROM "Product"
+    return _match_overrides(cur, ov, '''SELECT id, title FROM "Product"
                    WHERE title ILIKE '%probiotik%' OR title ILIKE '%probiotic%' ''')
-    pairs = [(pid, ov[d.normalize(title)]) for pid, title in cur.fetchall()
-             if d.normalize(title) in ov]
-    if pairs:
-        execute_values(
-            cur,
-            'UPDATE "Product" p SET "canonicalIdentity" = v.cid FROM (VALUES %s) AS v(id, cid) WHERE p.id = v.id',
-            pairs,
-        )
+
+
+def apply_probiotik_overrides(cur) -> int:
+    """Set canonicalIdentity for probiotik products from probiotik_override_pairs.
+    Returns rows matched."""
+    pairs = probiotik_override_pairs(cur)
+    _write_identities(cur, pairs)
     return len(pairs)
 
 
-def apply_line_overrides(cur) -> int:
-    """Set canonicalIdentity for products whose normalized core matches a curated
+def line_override_pairs(cur) -> list:
+    """(id, canonical) pairs for products whose normalized core matches a curated
     protein brand-line override (e.g. 'iso sensation isolate' -> 'Ultimate Nutrition
     Iso Sensation 93'). Collapses redundant descriptors while keeping genuine
-    concentrate/isolate splits. Returns rows updated."""
+    concentrate/isolate splits."""
     if not LINE_OVERRIDES.exists():
-        return 0
+        return []
     ov = json.loads(LINE_OVERRIDES.read_text())
     # MEASURE GUARD: only canonicalize products that carry a size/strength, so
     # BuildGroupKey's size/strength suffix keeps different packs apart. Products with
     # NO measure (a single bar vs a box of bars, sachets/diapers sold by count) would
     # otherwise all collapse into one group with a misleading price range.
-    cur.execute('''SELECT id, COALESCE("coreProductIdentity", '') FROM "Product"
+    return _match_overrides(cur, ov, '''SELECT id, COALESCE("coreProductIdentity", '') FROM "Product"
                    WHERE COALESCE("volumeValue",0) > 0 OR COALESCE("dosageValue",0) > 0''')
-    pairs = [(pid, ov[d.normalize(core)]) for pid, core in cur.fetchall() if d.normalize(core) in ov]
-    if pairs:
-        execute_values(
-            cur,
-            'UPDATE "Product" p SET "canonicalIdentity" = v.cid FROM (VALUES %s) AS v(id, cid) WHERE p.id = v.id',
-            pairs,
-        )
+
+
+def apply_line_overrides(cur) -> int:
+    """Set canonicalIdentity for products from line_override_pairs. Returns rows
+    matched."""
+    pairs = line_override_pairs(cur)
+    _write_identities(cur, pairs)
     return len(pairs)
 
 
@@ -253,18 +282,29 @@ def main():
 
     conn = psycopg2.connect(db_url)
     cur = conn.cursor()
-    cur.execute('UPDATE "Product" SET "canonicalIdentity" = NULL WHERE "canonicalIdentity" IS NOT NULL')
-    execute_values(
-        cur,
-        'UPDATE "Product" p SET "canonicalIdentity" = v.cid FROM (VALUES %s) AS v(id, cid) WHERE p.id = v.id',
-        list(pairs.items()),
+    # Resolve the final identity per product first (curated protein brand-line and
+    # probiotik overrides on top of the LLM pass; they cover different products),
+    # then write only the difference: changed/new identities in one keyed UPDATE,
+    # and stale ones cleared in another. No blanket NULL reset + full rewrite.
+    final = dict(pairs)
+    line_pairs = line_override_pairs(cur)
+    probiotik_pairs = probiotik_override_pairs(cur)
+    final.update(line_pairs)
+    final.update(probiotik_pairs)
+    log.info("line overrides applied: %d products; probiotik overrides: %d",
+             len(line_pairs), len(probiotik_pairs))
+    changed = _write_identities(cur, list(final.items()))
+    # NOT EXISTS over unnest() plans as a hashed anti-join; `id <> ALL(array)`
+    # would compare every row against the whole array.
+    cur.execute(
+        '''UPDATE "Product" p SET "canonicalIdentity" = NULL
+           WHERE p."canonicalIdentity" IS NOT NULL
+             AND NOT EXISTS (SELECT 1 FROM unnest(%s::text[]) AS k(id) WHERE k.id = p.id)''',
+        (list(final),),
     )
-    # Apply the curated protein brand-line overrides on top (different products than
-    # the bare-brand catch-alls above, so no conflict).
-    n_ov = apply_line_overrides(cur)
-    n_pb = apply_probiotik_overrides(cur)
-    log.info("line overrides applied: %d products; probiotik overrides: %d", n_ov, n_pb)
+    changed += cur.rowcount
     conn.commit()
+    log.info("rows changed: %d", changed)
     cur.execute('SELECT count(*) FROM "Product" WHERE "canonicalIdentity" IS NOT NULL')
     log.info("rows with canonicalIdentity now: %d", cur.fetchone()[0])
     conn.close()
@@ -15,6 +15,7 @@ This script:
 import os
 import sys
 import argparse
+import math
 from pathlib import Path
 import io
 
@@ -29,7 +30,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from matching_utils import normalize_lookup_text
+from matching_utils import MEASURE_VALUE_LIMITS, normalize_lookup_text
 
 
 def get_db_connection():
@@ -61,7 +62,10 @@ class ExcelRowReader:
         self.sheet_xml_path: str | None = None
         self.headers_by_col: dict[str, str] = {}
         self.required_headers = {'title', 'originalTitle', 'normalizedName'}
-        self.optional_headers = {'category', 'dosageValue', 'dosageUnit'}
+        self.optional_headers = {
+            'category', 'dosageValue', 'dosageUnit', 'quantityValue', 'quantityUnit',
+            'volumeValue', 'volumeUnit',
+        }
         self.needed_headers = self.required_headers | self.optional_headers
         self.needed_cols: set[str] = set()
 
@@ -259,6 +263,27 @@ class ExcelRowReader:
             yield row_values
 
 
+def _parse_measure(values: dict, name: str) -> tuple:
+    """Parse the <name>Value / <name>Unit cells into (value, unit)."""
+    value = None
+    unit = None
+    value_raw = values.get(f'{name}Value')
+    if value_raw is not None and str(value_raw).strip() != "":
+        try:
+            value = float(str(value_raw).replace(',', '.'))
+        except (ValueError, TypeError):
+            pass
+        # float() also accepts "nan", "inf" and "1e20"; none of them fit the
+        # column, and one would fail the whole import batch.
+        limit = MEASURE_VALUE_LIMITS[f'{name}_value']
+        if value is not None and not (math.isfinite(value) and abs(value) < limit):
+            value = None
+    unit_raw = values.get(f'{name}Unit')
+    if unit_raw is not None and str(unit_raw).strip() != "":
+        unit = str(unit_raw).strip()
+    return value, unit
+
+
 def prepare_row(values: dict) -> tuple | None:
     """Prepare a single row for database insertion."""
     title = values.get('title')
@@ -283,18 +308,12 @@ def prepare_row(values: dict) -> tuple | None:
     if not normalized_name:
         return None
 
-    # Parse dosage
-    dosage_value = None
-    dosage_unit = None
-    dosage_value_raw = values.get('dosageValue')
-    if dosage_value_raw is not None and str(dosage_value_raw).strip() != "":
-        try:
-            dosage_value = float(str(dosage_value_raw).replace(',', '.'))
-        except (ValueError, TypeError):
-            pass
-    dosage_unit_raw = values.get('dosageUnit')
-    if dosage_unit_raw is not None and str(dosage_unit_raw).strip() != "":
-        dosage_unit = str(dosage_unit_raw).strip()
+    dosage_value, dosage_unit = _parse_measure(values, 'dosage')
+    quantity_value, quantity_unit = _parse_measure(values, 'quantity')
+    volume_value, volume_unit = _parse_measure(values, 'volume')
+    if quantity_value is not None:
+        # quantityValue is an integer column.
+        quantity_value = int(quantity_value) if quantity_value.is_integer() else None
 
     return (
         title,
@@ -303,6 +322,10 @@ def prepare_row(values: dict) -> tuple | None:
         normalized_name,
         dosage_value,
         dosage_unit,
+        quantity_value,
+        quantity_unit,
+        volume_value,
+        volume_unit,
         1.0,  # confidence
         'excel_import'  # source
     )
@@ -318,6 +341,10 @@ def import_to_db(conn, rows_iter, batch_size: int = 200):
             "normalizedName",
             "dosageValue",
             "dosageUnit",
+            "quantityValue",
+            "quantityUnit",
+            "volumeValue",
+            "volumeUnit",
             confidence,
             source
         ) VALUES %s
@@ -325,6 +352,10 @@ def import_to_db(conn, rows_iter, batch_size: int = 200):
             "normalizedName" = EXCLUDED."normalizedName",
             "dosageValue" = EXCLUDED."dosageValue",
             "dosageUnit" = EXCLUDED."dosageUnit",
+            "quantityValue" = COALESCE(EXCLUDED."quantityValue", "ProductStandardization"."quantityValue"),
+            "quantityUnit" = COALESCE(EXCLUDED."quantityUnit", "ProductStandardization"."quantityUnit"),
+            "volumeValue" = COALESCE(EXCLUDED."volumeValue", "ProductStandardization"."volumeValue"),
+            "volumeUnit" = COALESCE(EXCLUDED."volumeUnit", "ProductStandardization"."volumeUnit"),
             "updatedAt" = CURRENT_TIMESTAMP
     """
 
@@ -342,61 +373,76 @@ def import_to_db(conn, rows_iter, batch_size: int = 200):
             if len(batch) < batch_size:
                 continue
 
-            try:
-                execute_values(cur, insert_sql, batch, page_size=min(batch_size, 200))
-                conn.commit()
-                inserted += len(batch)
-                print(f"Progress: inserted {inserted:,} rows")
-            except Exception as e:
-                conn.rollback()
-                print(f"Error inserting batch at {inserted}: {e}")
-                # Try inserting one by one to find problematic rows
-                for j, row in enumerate(batch):
-                    try:
-                        execute_values(cur, insert_sql, [row], page_size=1)
-                        conn.commit()
-                        inserted += 1
-                    except Exception as row_error:
-                        conn.rollback()
-                        print(f"  Skipping row {inserted + j}: {row_error}")
-
+            inserted = _insert_batch(conn, cur, insert_sql, batch, inserted)
             batch = []
 
         if batch:
-            try:
-                execute_values(cur, insert_sql, batch, page_size=min(batch_size, 200))
-                conn.commit()
-                inserted += len(batch)
-                print(f"Progress: inserted {inserted:,} rows")
-            except Exception as e:
-                conn.rollback()
-                print(f"Error inserting final batch at {inserted}: {e}")
-                for j, row in enumerate(batch):
-                    try:
-                        execute_values(cur, insert_sql, [row], page_size=1)
-                        conn.commit()
-                        inserted += 1
-                    except Exception as row_error:
-                        conn.rollback()
-                        print(f"  Skipping row {inserted + j}: {row_error}")
+            inserted = _insert_batch(conn, cur, insert_sql, batch, inserted)
 
     return inserted
 
 
-def get_stats(conn):
-    """Get statistics about imported data."""
-    with conn.cursor() as cur:
-        cur.execute('SELECT COUNT(*) FROM "ProductStandardization"')
-        total = cur.fetchone()[0]
+def _dedupe_batch(batch):
+    """Keep the last row per ("originalTitle", title) conflict key.
+
+    ON CONFLICT DO UPDATE cannot touch the same row twice in one statement, so a
+    repeated key used to fail the whole batch into the row-by-row fallback.
+    Rows with a NULL originalTitle never conflict and are all kept.
+    """
+    keyed = {}
+    for i, row in enumerate(batch):
+        keyed[(row[1], row[0]) if row[1] is not None else i] = row
+    return list(keyed.values())
 
-        cur.execute('SELECT COUNT(*) FROM "ProductStandardization" WHERE "dosageValue" IS NOT NULL')
-        with_dosage = cur.fetchone()[0]
 
-        cur.execute('SELECT COUNT(DISTINCT category) FROM "ProductStandardization"')
-        categories = cur.fetchone()[0]
+def _insert_batch(conn, cur, insert_sql, batch, inserted):
+    """Upsert one batch in a single statement; returns the new inserted total."""
+    batch = _dedupe_batch(batch)
+    try:
+        execute_values(cur, insert_sql, batch, page_size=len(batch))
+        conn.commit()
+        inserted += len(batch)
+        print(f"Progress: inserted {inserted:,} rows")
+        return inserted
+    except Exception as e:
+        conn.rollback()
+        print(f"Error inserting batch at {inserted}: {e}")
+
+    # Find the problematic rows one by one; a savepoint per row keeps the good
+    # ones in a single transaction instead of committing each row.
+    for j, row in enumerate(batch):
+        cur.execute("SAVEPOINT import_row")
+        try:
+            execute_values(cur, insert_sql, [row], page_size=1)
+            cur.execute("RELEASE SAVEPOINT import_row")
+            inserted += 1
+        except Exception as row_error:
+            cur.execute("ROLLBACK TO SAVEPOINT import_row")
+            print(f"  Skipping row {inserted + j}: {row_error}")
+    conn.commit()
+    return inserted
 
-        cur.execute('SELECT source, COUNT(*) FROM "ProductStandardization" GROUP BY source')
-        by_source = dict(cur.fetchall())
+
+def get_stats(conn):
+    """Get statistics about imported data."""
+    # One pass over the table: the () grouping set yields the overall totals,
+    # the (source) set the per-source counts.
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT GROUPING(source) = 1 AS is_total, source,
+                   COUNT(*), COUNT("dosageValue"), COUNT(DISTINCT category)
+            FROM "ProductStandardization"
+            GROUP BY GROUPING SETS ((source), ())
+        """)
+        rows = cur.fetchall()
+
+    total = with_dosage = categories = 0
+    by_source = {}
+    for is_total, source, count, dosage_count, category_count in rows:
+        if is_total:
+            total, with_dosage, categories = count, dosage_count, category_count
+        else:
+            by_source[source] = count
 
     return {
         'total': total,
@@ -475,7 +521,7 @@ def main():
 
         # Show stats
         stats = get_stats(conn)
-        print(f"\nDatabase statistics:")
+        print("\nDatabase statistics:")
         print(f"  Total rows: {stats['total']:,}")
         print(f"  With dosage: {stats['with_dosage']:,}")
         print(f"  Categories: {stats['categories']}")
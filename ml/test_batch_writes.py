@@ -0,0 +1,117 @@
+import unittest
+
+import populate_missing_data as p
+
+
+def parse_text_array(literal):
+    """Minimal Postgres array_in for a one-dimensional text[] literal."""
+    assert literal[0] == "{" and literal[-1] == "}", literal
+    body = literal[1:-1]
+    values = []
+    i = 0
+    while i < len(body):
+        if body[i] == '"':
+            i += 1
+            chars = []
+            while body[i] != '"':
+                if body[i] == "\\":
+                    i += 1
+                chars.append(body[i])
+                i += 1
+            i += 1
+            values.append("".join(chars))
+        else:
+            end = body.find(",", i)
+            end = len(body) if end < 0 else end
+            token = body[i:end].strip()
+            values.append(None if token.upper() == "NULL" else token)
+            i = end
+        if i < len(body):
+            assert body[i] == ",", literal
+            i += 1
+    return values
+
+
+class TextArrayLiteralTest(unittest.TestCase):
+    def assertRoundTrips(self, values):
+        self.assertEqual(parse_text_array(p._text_array_literal(values)), values)
+
+    def test_plain_tokens(self):
+        self.assertEqual(p._text_array_literal(["vitamin", "c"]), '{"vitamin","c"}')
+        self.assertRoundTrips(["vitamin", "c", "1000mg"])
+
+    def test_none_and_empty_list(self):
+        self.assertIsNone(p._text_array_literal(None))
+        self.assertEqual(p._text_array_literal([]), "{}")
+        self.assertEqual(parse_text_array("{}"), [])
+
+    def test_quotes_and_backslashes_are_escaped(self):
+        self.assertEqual(p._text_array_literal(['a"b', "c\\d"]), '{"a\\"b","c\\\\d"}')
+        self.assertRoundTrips(['a"b', "c\\d", '\\"', "\\", '"'])
+
+    def test_separators_and_braces_stay_inside_one_element(self):
+        self.assertRoundTrips(["a,b", "{x}", "}", "{", "a b", " padded "])
+
+    def test_empty_string_and_null_keyword_stay_strings(self):
+        literal = p._text_array_literal(["", "NULL", "null"])
+        self.assertEqual(literal, '{"","NULL","null"}')
+        self.assertRoundTrips(["", "NULL", "null"])
+
+    def test_non_ascii(self):
+        self.assertRoundTrips(["магнезијум", "čaj", "μg"])
+
+
+class ClearOutOfRangeTest(unittest.TestCase):
+    def cleared(self, values, limit):
+        columns = [list(values)]
+        with self.assertLogs(p.logger, "WARNING"):
+            p._clear_out_of_range(columns, {0: limit})
+        return columns[0]
+
+    def test_numeric_limit_boundaries(self):
+        self.assertEqual(
+            self.cleared([1e9, -1e9, 1e9 - 1e-6, -(1e9 - 1e-6), 0.0, 5.5], 1e9),
+            [None, None, 1e9 - 1e-6, -(1e9 - 1e-6), 0.0, 5.5],
+        )
+
+    def test_integer_limit_boundaries(self):
+        self.assertEqual(
+            self.cleared([2**31, -2**31, 2**31 - 1, -(2**31 - 1), 60], 2**31),
+            [None, None, 2**31 - 1, -(2**31 - 1), 60],
+        )
+
+    def test_nan_and_inf_are_cleared(self):
+        self.assertEqual(
+            self.cleared([float("nan"), float("inf"), float("-inf"), 1.0], 1e9),
+            [None, None, None, 1.0],
+        )
+
+    def test_none_and_in_range_values_are_kept_without_warning(self):
+        columns = [[None, 1.0, None]]
+        with self.assertNoLogs(p.logger, "WARNING"):
+            p._clear_out_of_range(columns, {0: 1e9})
+        self.assertEqual(columns, [[None, 1.0, None]])
+
+    def test_only_listed_columns_are_checked(self):
+        columns = [[1e12], [1e12]]
+        with self.assertLogs(p.logger, "WARNING"):
+            p._clear_out_of_range(columns, {1: 1e9})
+        self.assertEqual(columns, [[1e12], [None]])
+
+    def test_limit_table_positions(self):
+        for fields, limits in (
+            (p.ProductUpdate._fields, p._NUMERIC_COLUMN_LIMITS),
+            (p._STANDARDIZATION_UPSERT_COLUMNS, p._STANDARDIZATION_COLUMN_LIMITS),
+        ):
+            self.assertEqual(
+                {fields[i]: limit for i, limit in limits.items()},
+                {"dosage_value": 1e9, "quantity_value": 2**31, "volume_value": 1e9},
+            )
+
+    def test_standardization_columns_match_arg_types(self):
+        self.assertEqual(
+            len(p._STANDARDIZATION_UPSERT_COLUMNS), len(p._STANDARDIZATION_UPSERT_ARG_TYPES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -121,43 +121,8 @@ func (s *server) handleMobileFacets(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	facets := map[string]interface{}{}
-	if vendorRows, err := s.db.Query(`SELECT v.name, COUNT(*) FROM "Product" p JOIN "Vendor" v ON v.id = p."vendorId" GROUP BY v.name ORDER BY COUNT(*) DESC`); err == nil {
-		values := map[string]interface{}{}
-		for vendorRows.Next() {
-			var name string
-			var count int
-			if err := vendorRows.Scan(&name, &count); err == nil {
-				values[name] = count
-			}
-		}
-		vendorRows.Close()
-		facets["vendorName"] = values
-	}
-	if brandRows, err := s.db.Query(`SELECT "extractedBrand", COUNT(*) FROM "Product" WHERE "extractedBrand" IS NOT NULL AND "extractedBrand" != '' GROUP BY "extractedBrand" ORDER BY COUNT(*) DESC LIMIT 200`); err == nil {
-		values := map[string]interface{}{}
-		for brandRows.Next() {
-			var name string
-			var count int
-			if err := brandRows.Scan(&name, &count); err == nil {
-				values[name] = count
-			}
-		}
-		brandRows.Close()
-		facets["brand"] = values
-	}
-	if categoryRows, err := s.db.Query(`SELECT "canonicalCategory", COUNT(*) FROM "Product" WHERE "canonicalCategory" IS NOT NULL AND "canonicalCategory" != '' GROUP BY "canonicalCategory" ORDER BY COUNT(*) DESC`); err == nil {
-		values := map[string]interface{}{}
-		for categoryRows.Next() {
-			var name string
-			var count int
-			if err := categoryRows.Scan(&name, &count); err == nil {
-				values[name] = count
-			}
-		}
-		categoryRows.Close()
-		facets["category"] = values
-	}
+	facets := productFacetCounts(s.db)
+	delete(facets, "dosageUnit")
 
 	writeJSON(w, http.StatusOK, map[string]interface{}{"facets": facets})
 }
@@ -175,7 +140,7 @@ func (s *server) handleMobileAutocomplete(w http.ResponseWriter, r *http.Request
 		return
 	}
 
-	suggestions, err := autocompleteDB(s.db, query, limit)
+	suggestions, err := s.cachedAutocomplete(query, limit)
 	if err != nil {
 		writeErr(w, http.StatusInternalServerError, "could not autocomplete products")
 		return
@@ -11,6 +11,7 @@ import (
 	"time"
 
 	"github.com/callmeahab/pharma-search/internal/matching"
+	"github.com/lib/pq"
 )
 
 // groupSnapshot is the cheapest current offer for a product group.
@@ -253,7 +254,29 @@ func (s *server) runPriceWatch() error {
 		return fmt.Errorf("snapshot: %w", err)
 	}
 
+	// One history point per distinct watched group per run, written in one INSERT
+	// before any alerting so an alert or email failure can't lose the run's history.
 	historyDone := map[string]bool{}
+	var histKeys []string
+	var histMin []float64
+	var histOffers []int64
+	for _, wr := range watches {
+		gs, ok := snap[wr.groupKey]
+		if !ok || historyDone[wr.groupKey] {
+			continue
+		}
+		historyDone[wr.groupKey] = true
+		histKeys = append(histKeys, wr.groupKey)
+		histMin = append(histMin, gs.MinPrice)
+		histOffers = append(histOffers, int64(gs.OfferCount))
+	}
+	s.insertPriceHistory(histKeys, histMin, histOffers)
+
+	// Baselines of watches that did not alert are refreshed in one
+	// UPDATE ... FROM unnest() after the loop; alerted watches advance theirs in
+	// the same transaction as the AlertEvent (see recordAlert).
+	var baseIDs, baseVendors []string
+	var basePrices []float64
 	alerts := 0
 	for _, wr := range watches {
 		gs, ok := snap[wr.groupKey]
@@ -261,14 +284,6 @@ func (s *server) runPriceWatch() error {
 			continue // group no longer present (out of stock / re-extracted)
 		}
 
-		// One history point per distinct watched group per run.
-		if !historyDone[wr.groupKey] {
-			historyDone[wr.groupKey] = true
-			_, _ = s.db.Exec(
-				`INSERT INTO "GroupPriceHistory" ("groupKey","minPrice","offerCount") VALUES ($1,$2,$3)`,
-				wr.groupKey, gs.MinPrice, gs.OfferCount)
-		}
-
 		newPrice := gs.MinPrice
 		var oldPrice *float64
 		if wr.lastPrice.Valid {
@@ -288,27 +303,97 @@ func (s *server) runPriceWatch() error {
 		}
 
 		if kind != "" {
-			_, err := s.db.Exec(
-				`INSERT INTO "AlertEvent" ("watchId","userId",kind,"oldPrice","newPrice",vendor) VALUES ($1,$2,$3,$4,$5,$6)`,
-				wr.id, wr.userID, kind, oldPrice, newPrice, gs.Vendor)
-			if err == nil {
-				alerts++
-				s.sendPriceAlertEmail(wr, kind, oldPrice, newPrice, gs.Vendor)
-			} else {
+			// On failure neither the event nor the baseline is stored and no email
+			// is sent, so the alert is retried on the next run.
+			if err := s.recordAlert(wr, kind, oldPrice, newPrice, gs.Vendor); err != nil {
 				log.Printf("pricewatch: alert insert failed for watch %s: %v", wr.id, err)
+				continue
 			}
+			alerts++
+			s.sendPriceAlertEmail(wr, kind, oldPrice, newPrice, gs.Vendor)
+			continue
 		}
 
-		// Refresh the baseline regardless (so price increases update silently).
-		_, _ = s.db.Exec(`UPDATE "Watch" SET "lastPrice"=$1, "lastVendor"=$2 WHERE id=$3`,
-			newPrice, gs.Vendor, wr.id)
+		// Refresh the baseline of non-alerting watches (so price increases update
+		// silently).
+		baseIDs = append(baseIDs, wr.id)
+		basePrices = append(basePrices, newPrice)
+		baseVendors = append(baseVendors, gs.Vendor)
 	}
 
+	s.updateWatchBaselines(baseIDs, basePrices, baseVendors)
+
 	log.Printf("pricewatch: %d watches, %d groups priced, %d alerts in %v",
 		len(watches), len(snap), alerts, time.Since(start).Round(time.Millisecond))
 	return nil
 }
 
+// recordAlert stores the AlertEvent and advances the watch's baseline in one
+// transaction, so a sent alert always has its baseline moved and can't re-fire.
+func (s *server) recordAlert(wr watchRow, kind string, oldPrice *float64, newPrice float64, vendor string) error {
+	tx, err := s.db.Begin()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	if _, err := tx.Exec(
+		`INSERT INTO "AlertEvent" ("watchId","userId",kind,"oldPrice","newPrice",vendor) VALUES ($1,$2,$3,$4,$5,$6)`,
+		wr.id, wr.userID, kind, oldPrice, newPrice, vendor); err != nil {
+		return err
+	}
+	if _, err := tx.Exec(`UPDATE "Watch" SET "lastPrice"=$1, "lastVendor"=$2 WHERE id=$3`,
+		newPrice, vendor, wr.id); err != nil {
+		return err
+	}
+	return tx.Commit()
+}
+
+// updateWatchBaselines refreshes lastPrice/lastVendor for the given watches in one
+// UPDATE ... FROM unnest(), falling back to per-watch updates if that fails.
+func (s *server) updateWatchBaselines(ids []string, prices []float64, vendors []string) {
+	if len(ids) == 0 {
+		return
+	}
+	_, err := s.db.Exec(`
+		UPDATE "Watch" w SET "lastPrice" = b.price, "lastVendor" = b.vendor
+		FROM unnest($1::text[], $2::float8[], $3::text[]) AS b(id, price, vendor)
+		WHERE w.id = b.id`,
+		pq.Array(ids), pq.Array(prices), pq.Array(vendors))
+	if err == nil {
+		return
+	}
+	log.Printf("pricewatch: batched baseline update failed, retrying per watch: %v", err)
+	for i, id := range ids {
+		if _, err := s.db.Exec(`UPDATE "Watch" SET "lastPrice"=$1, "lastVendor"=$2 WHERE id=$3`,
+			prices[i], vendors[i], id); err != nil {
+			log.Printf("pricewatch: baseline update failed for watch %s: %v", id, err)
+		}
+	}
+}
+
+// insertPriceHistory writes the run's history points in one INSERT ... unnest().
+// If that fails, each point is retried on its own so one bad row can't drop the rest.
+func (s *server) insertPriceHistory(keys []string, minPrices []float64, offers []int64) {
+	if len(keys) == 0 {
+		return
+	}
+	_, err := s.db.Exec(`
+		INSERT INTO "GroupPriceHistory" ("groupKey","minPrice","offerCount")
+		SELECT * FROM unnest($1::text[], $2::float8[], $3::int[])`,
+		pq.Array(keys), pq.Array(minPrices), pq.Array(offers))
+	if err == nil {
+		return
+	}
+	log.Printf("pricewatch: batched history insert failed, retrying per group: %v", err)
+	for i, key := range keys {
+		if _, err := s.db.Exec(
+			`INSERT INTO "GroupPriceHistory" ("groupKey","minPrice","offerCount") VALUES ($1,$2,$3)`,
+			key, minPrices[i], offers[i]); err != nil {
+			log.Printf("pricewatch: history insert failed for group %s: %v", key, err)
+		}
+	}
+}
+
 func (s *server) sendPriceAlertEmail(wr watchRow, kind string, oldPrice *float64, newPrice float64, vendor string) {
 	if wr.email == "" {
 		return